@@ -1,14 +1,47 @@
 """Wiener Linien real-time departure API client."""
 
+import hashlib
 import logging
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from heapq import merge
+from itertools import islice
+from typing import Any, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    # orjson has no wheel on some Pi images; stdlib json accepts bytes too
+    import json
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
 
 logger = logging.getLogger(__name__)
 
 API_URL = "https://www.wienerlinien.at/ogd_realtime/monitor"
 REQUEST_TIMEOUT = 10
+USER_AGENT = "echtzeitinfo/1.0 (+https://github.com/markszollosi/echtzeitinfo)"
+# RBLs per request; larger configs are split and fetched in parallel. This
+# also bounds each response body, so parsing it whole stays cheap on the Pi.
+RBL_CHUNK_SIZE = 10
+MAX_PARALLEL_REQUESTS = 4
+
+# Shared session so refresh cycles reuse the keep-alive connection
+# instead of doing a fresh TCP+TLS handshake on every poll
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_PARALLEL_REQUESTS))
+_SESSION.headers["Accept-Encoding"] = "gzip"
+_SESSION.headers["User-Agent"] = USER_AGENT
+
+# Validators and parsed result of the last 200 response per RBL chunk,
+# used to send conditional GETs and reuse monitors on 304 Not Modified
+_LAST_RESPONSE: dict[tuple[int, ...], tuple[dict[str, str], list[dict[str, Any]]]] = {}
 
 # API error codes
 ERROR_CODES = {
@@ -30,16 +63,35 @@ def fetch_departures(rbls: list[int]) -> list[dict[str, Any]]:
                 - countdown: int (minutes)
                 - realtime: bool
     """
+    chunks = [rbls[i:i + RBL_CHUNK_SIZE] for i in range(0, len(rbls), RBL_CHUNK_SIZE)]
+    if len(chunks) <= 1:
+        return _fetch_chunk(rbls)
+
+    # Overlap the round-trips so a large config costs max(latency), not sum
+    with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_PARALLEL_REQUESTS)) as pool:
+        results = pool.map(_fetch_chunk, chunks)
+    return [monitor for chunk_monitors in results for monitor in chunk_monitors]
+
+
+def _fetch_chunk(rbls: list[int]) -> list[dict[str, Any]]:
+    """Fetch and parse departures for a single request's worth of RBLs."""
     params = [("rbl", rbl) for rbl in rbls]
+    cache_key = tuple(rbls)
+    cached = _LAST_RESPONSE.get(cache_key)
+    headers = cached[0] if cached else None
 
     try:
-        resp = requests.get(API_URL, params=params, timeout=REQUEST_TIMEOUT)
+        resp = _SESSION.get(API_URL, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
     except requests.RequestException as e:
         logger.error("API request failed: %s", e)
         return []
 
-    data = resp.json()
+    if resp.status_code == 304 and cached:
+        logger.debug("API data not modified for RBLs %s", rbls)
+        return cached[1]
+
+    data = _json_loads(resp.content)
 
     message = data.get("message", {})
     server_code = message.get("serverCode")
@@ -49,21 +101,24 @@ def fetch_departures(rbls: list[int]) -> list[dict[str, Any]]:
 
     monitors = []
     for monitor in data.get("data", {}).get("monitors", []):
-        rbl = monitor.get("locationStop", {}).get("properties", {}).get("attributes", {}).get("rbl")
+        rbl = _rbl_of(monitor)
 
         for line_data in monitor.get("lines", []):
             line_name = line_data.get("name", "?").strip()
             towards = line_data.get("towards", "?").strip().title()
 
-            departures = []
-            for dep in line_data.get("departures", {}).get("departure", []):
-                dep_time = dep.get("departureTime", {})
-                countdown = dep_time.get("countdown")
-                if countdown is not None:
-                    departures.append({
-                        "countdown": countdown,
-                        "realtime": dep_time.get("timePlanned") != dep_time.get("timeReal"),
-                    })
+            departures = [
+                {
+                    "countdown": countdown,
+                    "realtime": dep_time.get("timePlanned") != dep_time.get("timeReal"),
+                }
+                for dep_time in (dep.get("departureTime", {}) for dep in _departures_of(line_data))
+                if (countdown := dep_time.get("countdown")) is not None
+            ]
+            # group_by_station merges these lists and relies on them being in
+            # countdown order; the API normally sends them that way, so this
+            # is a cheap linear pass for timsort
+            departures.sort(key=_countdown)
 
             monitors.append({
                 "rbl": rbl,
@@ -72,33 +127,85 @@ def fetch_departures(rbls: list[int]) -> list[dict[str, Any]]:
                 "departures": departures,
             })
 
+    validators = {}
+    if "ETag" in resp.headers:
+        validators["If-None-Match"] = resp.headers["ETag"]
+    if "Last-Modified" in resp.headers:
+        validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+    if validators:
+        _LAST_RESPONSE[cache_key] = (validators, monitors)
+    else:
+        _LAST_RESPONSE.pop(cache_key, None)
+
     return monitors
 
 
-def group_by_station(monitors: list[dict], stations_config: list[dict]) -> list[dict]:
+def _rbl_of(monitor: dict) -> Optional[int]:
+    """Extract the RBL number from a raw API monitor, or None if missing."""
+    try:
+        return monitor["locationStop"]["properties"]["attributes"]["rbl"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _departures_of(line_data: dict) -> list[dict]:
+    """Extract the raw departure list from an API line entry."""
+    try:
+        return line_data["departures"]["departure"]
+    except (KeyError, TypeError):
+        return []
+
+
+def _countdown(departure: dict) -> int:
+    return departure["countdown"]
+
+
+def group_by_station(
+    monitors: list[dict], stations_config: list[dict], max_departures: Optional[int] = None,
+) -> list[dict]:
     """Group monitor data by configured stations.
 
+    Args:
+        monitors: output of fetch_departures(), departures in countdown order
+        stations_config: the "stations" list from config.yaml
+        max_departures: keep only this many earliest departures per line
+            (None keeps all)
+
     Returns a list of dicts:
         - name: station name
         - lines: list of line dicts (name, towards, departures)
     """
-    result = []
-    for station in stations_config:
-        station_rbls = set(station["rbls"])
-        lines = [m for m in monitors if m.get("rbl") in station_rbls]
+    # Single pass over monitors: map each RBL to the station(s) that list it.
+    # dict.fromkeys drops repeated RBLs within a station (like the old set()),
+    # so a station never receives the same monitor twice.
+    rbl_to_idx: dict[int, list[int]] = {}
+    for i, station in enumerate(stations_config):
+        for rbl in dict.fromkeys(station["rbls"]):
+            rbl_to_idx.setdefault(rbl, []).append(i)
+
+    buckets = [[] for _ in stations_config]
+    for m in monitors:
+        for i in rbl_to_idx.get(m.get("rbl"), ()):
+            buckets[i].append(m)
 
+    result = []
+    for station, lines in zip(stations_config, buckets):
         # Deduplicate lines with same name+direction (case-insensitive),
         # merge departures and keep earliest countdowns
         seen = {}
         for line in lines:
             key = (line["name"].upper(), line["towards"].upper())
             if key not in seen:
-                seen[key] = line
+                # Copy so merging never mutates the (possibly cached) monitor
+                seen[key] = {**line, "departures": line["departures"][:max_departures]}
             else:
+                # Both lists are in countdown order (sorted in _fetch_chunk),
+                # so merge lazily and stop after max_departures items
                 existing = seen[key]
-                merged = existing["departures"] + line["departures"]
-                merged.sort(key=lambda d: d["countdown"])
-                existing["departures"] = merged
+                existing["departures"] = list(islice(
+                    merge(existing["departures"], line["departures"], key=_countdown),
+                    max_departures,
+                ))
 
         result.append({
             "name": station["name"],
@@ -108,6 +215,16 @@ def group_by_station(monitors: list[dict], stations_config: list[dict]) -> list[
     return result
 
 
+def digest(stations_data: list[dict]) -> bytes:
+    """Return a fingerprint of group_by_station() output for change detection."""
+    return hashlib.blake2b(_json_dumps(stations_data), digest_size=16).digest()
+
+
+def close_session():
+    """Close the shared HTTP session and its pooled connections."""
+    _SESSION.close()
+
+
 if __name__ == "__main__":
     import json
     import sys
@@ -4,21 +4,51 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-from PIL import Image
+from PIL import Image, ImageChops
 
 logger = logging.getLogger(__name__)
 
+# Fall back to a whole-frame refresh when the changed area exceeds this
+# fraction of the screen
+PARTIAL_MAX_FRACTION = 0.5
+
+# Simulate-mode file formats
+OUTPUT_FORMATS = ("pbm", "png")
+
+# PIL mode "1" stores 1 = white, the panel expects 1 = black
+_INVERT = bytes(b ^ 0xFF for b in range(256))
+
+
+def _pack(image: Image.Image) -> bytes:
+    """Pack a 1-bit image into the inverted byte layout used by the EPD driver.
+
+    Equivalent to EPD.getbuffer() for a correctly sized image, but mode "1"
+    is already stored as MSB-first packed rows, so this is two C-level copies
+    instead of a Python loop over every byte.
+    """
+    if image.mode != "1":
+        image = image.convert("1")
+    return image.tobytes().translate(_INVERT)
+
 
 class Display:
-    """Wraps e-paper hardware or simulates output to PNG files."""
+    """Wraps e-paper hardware or simulates output to PBM/PNG files."""
 
     def __init__(self, config: dict):
         self._simulate = config.get("simulate", False)
         self._output_dir = Path(config.get("output_dir", "output"))
+        self._output_format = str(config.get("output_format", "pbm")).strip().lower()
+        if self._output_format not in OUTPUT_FORMATS:
+            logger.warning(
+                "Unknown output_format %r (expected one of %s), using pbm",
+                config.get("output_format"), ", ".join(OUTPUT_FORMATS),
+            )
+            self._output_format = "pbm"
         self._epd_type = config.get("type", "epd7in5_V2")
         self._full_refresh_every = config.get("full_refresh_every", 5)
         self._cycle_count = 0
         self._epd = None
+        self._last_image = None
 
     def init(self):
         """Initialize the display."""
@@ -44,31 +74,70 @@ class Display:
             raise
 
     def update(self, image: Image.Image):
-        """Send an image to the display (or save as PNG in simulate mode)."""
+        """Send an image to the display (or save to a file in simulate mode)."""
         self._cycle_count += 1
         needs_full_refresh = (self._cycle_count % self._full_refresh_every) == 0
 
         if self._simulate:
-            filename = datetime.now().strftime("departure_%Y%m%d_%H%M%S.png")
-            path = self._output_dir / filename
-            image.save(str(path))
+            filename = datetime.now().strftime("departure_%Y%m%d_%H%M%S")
+            if self._output_format == "png":
+                path = self._output_dir / f"{filename}.png"
+                image.save(str(path))
+            else:
+                # Raw P4 bitmap: no deflate pass, much cheaper than PNG
+                path = self._output_dir / f"{filename}.pbm"
+                image.save(str(path), format="PPM")
             refresh_type = "full" if needs_full_refresh else "partial"
             logger.info("Saved %s (cycle %d, %s refresh)", path, self._cycle_count, refresh_type)
         else:
-            if needs_full_refresh:
-                logger.info("Full refresh (cycle %d)", self._cycle_count)
-                self._epd.init()
-                self._epd.Clear()
-                self._epd.init()
-            else:
-                logger.debug("Fast refresh (cycle %d)", self._cycle_count)
-                try:
-                    self._epd.init_fast()
-                except AttributeError:
-                    # Older library versions may not have init_fast
+            if needs_full_refresh or not self._update_partial(image):
+                if needs_full_refresh:
+                    logger.info("Full refresh (cycle %d)", self._cycle_count)
+                    self._epd.init()
+                    self._epd.Clear()
                     self._epd.init()
+                else:
+                    logger.debug("Fast refresh (cycle %d)", self._cycle_count)
+                    try:
+                        self._epd.init_fast()
+                    except AttributeError:
+                        # Older library versions may not have init_fast
+                        self._epd.init()
+
+                self._epd.display(_pack(image))
+
+            # The renderer reuses its buffer, so keep our own copy to diff against
+            self._last_image = image.copy()
+
+    def _update_partial(self, image: Image.Image) -> bool:
+        """Push only the changed region of the frame via a windowed partial refresh.
+
+        Returns False if a partial update isn't possible and the caller should
+        send the whole frame instead.
+        """
+        last = self._last_image
+        if last is None or last.size != image.size:
+            return False
+        if not (hasattr(self._epd, "display_Partial") and hasattr(self._epd, "init_part")):
+            # Older library versions may not support windowed updates
+            return False
+
+        bbox = ImageChops.logical_xor(image, last).getbbox()
+        if bbox is None:
+            logger.debug("Frame unchanged, skipping refresh (cycle %d)", self._cycle_count)
+            return True
+
+        # The controller addresses the window in whole bytes (8 pixels)
+        x0, y0, x1, y1 = bbox
+        x0 = x0 // 8 * 8
+        x1 = min(-(-x1 // 8) * 8, image.width)
+        if (x1 - x0) * (y1 - y0) > PARTIAL_MAX_FRACTION * image.width * image.height:
+            return False
 
-            self._epd.display(self._epd.getbuffer(image))
+        logger.debug("Partial refresh of %s (cycle %d)", (x0, y0, x1, y1), self._cycle_count)
+        self._epd.init_part()
+        self._epd.display_Partial(_pack(image.crop((x0, y0, x1, y1))), x0, y0, x1, y1)
+        return True
 
     def clear(self):
         """Clear the display to white."""
@@ -78,6 +147,7 @@ class Display:
             if self._epd:
                 self._epd.init()
                 self._epd.Clear()
+                self._last_image = None
 
     def sleep(self):
         """Put the display into low-power sleep mode."""
@@ -3,24 +3,27 @@
 import logging
 import signal
 import sys
+import threading
 import time
 from pathlib import Path
 
 import yaml
 
-from src.api import fetch_departures, group_by_station
+from src.api import close_session, digest, fetch_departures, group_by_station
 from src.display import Display
-from src.renderer import render_departures
+from src.renderer import COUNTDOWN_COLS, render_departures
 
 logger = logging.getLogger("echtzeitinfo")
 
 _running = True
+_stop = threading.Event()
 
 
 def _shutdown(signum, frame):
     global _running
     logger.info("Received signal %d, shutting down...", signum)
     _running = False
+    _stop.set()
 
 
 def load_config(path: str = "config.yaml") -> dict:
@@ -51,6 +54,9 @@ def main():
         all_rbls.extend(station["rbls"])
 
     refresh_interval = config.get("refresh_interval", 60)
+    # Redraw unchanged departures at least this often so the on-screen
+    # timestamp never trails the last redraw by more than this many seconds
+    timestamp_max_age = config.get("timestamp_max_age", 5 * refresh_interval)
 
     # Merge display config with full_refresh_every from top level
     display_config = config.get("display", {})
@@ -60,24 +66,32 @@ def main():
 
     try:
         display.init()
+        prev_hash = None
+        last_update = 0.0
 
         while _running:
             # Fetch
             logger.info("Fetching departures for RBLs: %s", all_rbls)
             monitors = fetch_departures(all_rbls)
-            stations_data = group_by_station(monitors, config["stations"])
-
-            # Render
-            image = render_departures(stations_data)
-
-            # Update display
-            display.update(image)
-
-            # Sleep in small increments so we can respond to signals
-            for _ in range(refresh_interval):
-                if not _running:
-                    break
-                time.sleep(1)
+            # Only the first COUNTDOWN_COLS departures per line are drawn
+            stations_data = group_by_station(monitors, config["stations"], max_departures=COUNTDOWN_COLS)
+
+            # Skip the slow e-paper refresh when nothing visible has changed
+            h = digest(stations_data)
+            if h == prev_hash and time.monotonic() - last_update < timestamp_max_age:
+                logger.debug("Departures unchanged, skipping display update")
+            else:
+                # Render
+                image = render_departures(stations_data, layout_key=h)
+
+                # Update display
+                display.update(image)
+                prev_hash = h
+                last_update = time.monotonic()
+
+            # Sleep for the whole interval; the signal handler wakes us early
+            if _stop.wait(refresh_interval):
+                break
 
     except Exception:
         logger.exception("Unexpected error")
@@ -85,6 +99,7 @@ def main():
         logger.info("Cleaning up display...")
         display.clear()
         display.sleep()
+        close_session()
         logger.info("Goodbye.")
 
 
@@ -2,7 +2,9 @@
 
 import logging
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 from PIL import Image, ImageDraw, ImageFont
 
@@ -45,6 +47,38 @@ def _init_fonts():
     FONT_COUNTDOWN = _load_font("DejaVuSans-Bold.ttf", 24)
     FONT_TIMESTAMP = _load_font("DejaVuSans.ttf", 16)
     FONT_ATTRIBUTION = _load_font("DejaVuSans.ttf", 12)
+    _COUNTDOWN_W[:] = [_text_width(t, FONT_COUNTDOWN) for t in _COUNTDOWN_TEXT]
+
+
+# Countdown labels for 0-99 minutes and their pixel widths (filled by _init_fonts)
+_COUNTDOWN_TEXT = [f"{n}'" for n in range(100)]
+_COUNTDOWN_W: list[int] = []
+
+# Persistent render target, reused across refreshes (see render_departures)
+_CANVAS: Optional[Image.Image] = None
+_DRAW: Optional[ImageDraw.ImageDraw] = None
+
+# (key, draw commands) of the last layout, see render_departures(layout_key=...)
+_LAYOUT_CACHE: Optional[tuple[tuple, list[tuple]]] = None
+
+# Scratch surface for width measurements, so they need no render target and
+# use the same 1-bit font mode as the canvas
+_MEASURE_DRAW = ImageDraw.Draw(Image.new("1", (1, 1)))
+
+
+@lru_cache(maxsize=512)
+def _text_width(text: str, font: ImageFont.ImageFont) -> int:
+    """Advance width of text in pixels, memoized since most strings repeat every refresh."""
+    return round(_MEASURE_DRAW.textlength(text, font=font))
+
+
+@lru_cache(maxsize=128)
+def _line_badge(name: str, font: ImageFont.ImageFont) -> Image.Image:
+    """Pre-rasterized line label (e.g. "U3"), drawn once and pasted on every refresh."""
+    right, bottom = _MEASURE_DRAW.textbbox((0, 0), name, font=font)[2:]
+    badge = Image.new("1", (max(right, _text_width(name, font), 1), max(bottom, 1)), 1)
+    ImageDraw.Draw(badge).text((0, 0), name, font=font, fill=0)
+    return badge
 
 
 # Layout constants
@@ -57,22 +91,70 @@ COUNTDOWN_COLS = 3
 COUNTDOWN_WIDTH = 50
 
 
-def render_departures(stations_data: list[dict], width: int = WIDTH, height: int = HEIGHT) -> Image.Image:
+def render_departures(
+    stations_data: list[dict], width: int = WIDTH, height: int = HEIGHT, layout_key: Optional[bytes] = None,
+) -> Image.Image:
     """Render departure data to a 1-bit PIL Image.
 
     Args:
         stations_data: output of api.group_by_station()
         width: image width in pixels
         height: image height in pixels
+        layout_key: fingerprint of stations_data (e.g. api.digest()); when it
+            matches the previous call the cached layout is reused
 
     Returns:
-        PIL Image in mode "1" (1-bit black and white)
+        PIL Image in mode "1" (1-bit black and white). The same buffer is
+        reused and overwritten by the next call; copy it to keep a frame.
     """
+    global _CANVAS, _DRAW, _LAYOUT_CACHE
     if FONT_STATION is None:
         _init_fonts()
 
-    img = Image.new("1", (width, height), 1)  # 1 = white
-    draw = ImageDraw.Draw(img)
+    if _CANVAS is None or _CANVAS.size != (width, height):
+        _CANVAS = Image.new("1", (width, height), 1)  # 1 = white
+        _DRAW = ImageDraw.Draw(_CANVAS)
+    else:
+        _DRAW.rectangle((0, 0, width, height), fill=1)
+    img = _CANVAS
+    draw = _DRAW
+
+    cache_key = (layout_key, width, height)
+    if layout_key is not None and _LAYOUT_CACHE is not None and _LAYOUT_CACHE[0] == cache_key:
+        cmds = _LAYOUT_CACHE[1]
+    else:
+        cmds = _layout(stations_data, width, height)
+        _LAYOUT_CACHE = (cache_key, cmds) if layout_key is not None else None
+
+    for op, xy, arg, font in cmds:
+        if op == "text":
+            draw.text(xy, arg, font=font, fill=0)
+        elif op == "paste":
+            img.paste(arg, xy)
+        else:
+            draw.line(xy, fill=0, width=1)
+
+    # Timestamp at bottom right (changes every render, so neither the layout
+    # nor its width goes through the caches)
+    now = datetime.now().strftime("Aktualisiert %H:%M:%S")
+    ts_width = round(_MEASURE_DRAW.textlength(now, font=FONT_TIMESTAMP))
+    draw.text((width - MARGIN_X - ts_width, height - 40), now, font=FONT_TIMESTAMP, fill=0)
+
+    return img
+
+
+def _layout(stations_data: list[dict], width: int, height: int) -> list[tuple]:
+    """Compute draw commands for everything except the timestamp.
+
+    Each command is (op, xy, arg, font) with op one of "text", "paste" or
+    "line". Stations and rows starting below the bottom margin are dropped.
+    """
+    cmds = []
+    max_y = height - MARGIN_Y
+
+    # Right edge of each countdown column, shared by every row
+    countdown_start_x = width - MARGIN_X - COUNTDOWN_COLS * COUNTDOWN_WIDTH
+    col_right_x = [countdown_start_x + (j + 1) * COUNTDOWN_WIDTH for j in range(COUNTDOWN_COLS)]
 
     y = MARGIN_Y
 
@@ -80,64 +162,70 @@ def render_departures(stations_data: list[dict], width: int = WIDTH, height: int
         # Station separator line (not before first station)
         if i > 0:
             y += SEPARATOR_GAP // 2
-            draw.line([(MARGIN_X, y), (width - MARGIN_X, y)], fill=0, width=1)
+            if y > max_y:
+                break
+            cmds.append(("line", [(MARGIN_X, y), (width - MARGIN_X, y)], None, None))
             y += SEPARATOR_GAP // 2
 
+        if y > max_y:
+            break
+
         # Station name header
-        draw.text((MARGIN_X, y), f"\u25cf {station['name']}", font=FONT_STATION, fill=0)
+        cmds.append(("text", (MARGIN_X, y), f"\u25cf {station['name']}", FONT_STATION))
         y += STATION_HEIGHT
 
         # Lines
         for line in station.get("lines", []):
-            _draw_line_row(draw, y, line, width)
+            if y > max_y:
+                break
+            _layout_line_row(cmds, y, line, width, col_right_x)
             y += LINE_HEIGHT
 
-    # Timestamp at bottom right
-    now = datetime.now().strftime("Aktualisiert %H:%M:%S")
-    ts_bbox = draw.textbbox((0, 0), now, font=FONT_TIMESTAMP)
-    ts_width = ts_bbox[2] - ts_bbox[0]
-    draw.text((width - MARGIN_X - ts_width, height - 40), now, font=FONT_TIMESTAMP, fill=0)
-
     # Attribution at bottom left
     attribution = "Datenquelle: Stadt Wien \u2014 data.wien.gv.at"
-    draw.text((MARGIN_X, height - 22), attribution, font=FONT_ATTRIBUTION, fill=0)
+    cmds.append(("text", (MARGIN_X, height - 22), attribution, FONT_ATTRIBUTION))
 
-    return img
+    return cmds
 
 
-def _draw_line_row(draw: ImageDraw.ImageDraw, y: int, line: dict, width: int):
-    """Draw a single departure line row."""
+def _layout_line_row(cmds: list[tuple], y: int, line: dict, width: int, col_right_x: list[int]):
+    """Append draw commands for a single departure line row."""
     x = MARGIN_X + 16  # indent under station name
 
     # Line name (e.g. "U3")
-    draw.text((x, y), line["name"], font=FONT_LINE, fill=0)
-    line_bbox = draw.textbbox((x, y), line["name"], font=FONT_LINE)
-    x_after_line = line_bbox[2] + 12
+    cmds.append(("paste", (x, y), _line_badge(line["name"], FONT_LINE), None))
+    x_after_line = x + _text_width(line["name"], FONT_LINE) + 12
 
     # Direction (e.g. "Ottakring")
     max_dir_width = width - MARGIN_X - (COUNTDOWN_COLS * COUNTDOWN_WIDTH) - x_after_line - 10
     direction = line["towards"]
-    # Truncate direction if too long
-    dir_bbox = draw.textbbox((0, 0), direction, font=FONT_DIRECTION)
-    if dir_bbox[2] - dir_bbox[0] > max_dir_width:
-        while len(direction) > 3:
-            direction = direction[:-1]
-            bbox = draw.textbbox((0, 0), direction + "\u2026", font=FONT_DIRECTION)
-            if bbox[2] - bbox[0] <= max_dir_width:
-                direction += "\u2026"
-                break
-
-    draw.text((x_after_line, y + 2), direction, font=FONT_DIRECTION, fill=0)
+    # Truncate direction if too long: binary search for the longest prefix
+    # (at least 3 characters) that still fits with an ellipsis appended
+    if len(direction) > 3 and _text_width(direction, FONT_DIRECTION) > max_dir_width:
+        lo, hi = 3, len(direction) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if _text_width(direction[:mid] + "\u2026", FONT_DIRECTION) <= max_dir_width:
+                lo = mid
+            else:
+                hi = mid - 1
+        if _text_width(direction[:lo] + "\u2026", FONT_DIRECTION) <= max_dir_width:
+            direction = direction[:lo] + "\u2026"
+        else:
+            direction = direction[:lo]
+
+    cmds.append(("text", (x_after_line, y + 2), direction, FONT_DIRECTION))
 
     # Countdown columns (right-aligned)
     departures = line.get("departures", [])[:COUNTDOWN_COLS]
-    countdown_start_x = width - MARGIN_X - COUNTDOWN_COLS * COUNTDOWN_WIDTH
 
-    for j, dep in enumerate(departures):
+    for right_x, dep in zip(col_right_x, departures):
         minutes = dep["countdown"]
-        text = str(minutes) + "'"
-        col_x = countdown_start_x + j * COUNTDOWN_WIDTH
+        if 0 <= minutes < len(_COUNTDOWN_TEXT):
+            text = _COUNTDOWN_TEXT[minutes]
+            text_w = _COUNTDOWN_W[minutes]
+        else:
+            text = str(minutes) + "'"
+            text_w = _text_width(text, FONT_COUNTDOWN)
         # Right-align within column
-        bbox = draw.textbbox((0, 0), text, font=FONT_COUNTDOWN)
-        text_w = bbox[2] - bbox[0]
-        draw.text((col_x + COUNTDOWN_WIDTH - text_w, y), text, font=FONT_COUNTDOWN, fill=0)
+        cmds.append(("text", (right_x - text_w, y), text, FONT_COUNTDOWN))